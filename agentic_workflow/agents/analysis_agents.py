@@ -1,14 +1,26 @@
+import asyncio
 from google.adk import Agent
 from google.adk.models import Gemini
+from google.adk.planners import BuiltInPlanner
+from google.genai import types
 from tools.search_tools import SerperDevTool
 from tools.scrape_tools import ScrapeWebsiteTool
 
 from config import get_model
 
-search_tool = SerperDevTool()
+search_tool = SerperDevTool.instance()
 scrape_tool = ScrapeWebsiteTool()
 
-model = get_model()
+# Limite de páginas de concorrentes coletadas simultaneamente
+MAX_CONCURRENT_COMPETITOR_SCRAPES = 5
+
+# Orçamento de saída do escritor. O gemini-2.5-pro sempre raciocina antes de
+# responder e os tokens de raciocínio contam em max_output_tokens, então o
+# limite é o orçamento de raciocínio somado ao texto visível (três blogs de até
+# 800 palavras cada).
+WRITER_THINKING_BUDGET = 2048
+WRITER_VISIBLE_OUTPUT_TOKENS = 6144
+WRITER_MAX_OUTPUT_TOKENS = WRITER_THINKING_BUDGET + WRITER_VISIBLE_OUTPUT_TOKENS
 
 class CompetitorIdentifier(Agent):
     def __init__(self):
@@ -25,7 +37,7 @@ class CompetitorIdentifier(Agent):
             IMPORTANTE: Foque em retornar CONCORRENTES de mesmo TAMANHO de empresa. Por exemplo: caso o usuário forneça uma URL de uma empresa de médio porte, você NÃO DEVE retornar um concorrente líder do mercado global como rival direto de mercado, a menos que este REALMENTE seja o único concorrente. Considere, se possível, a LOCALIZAÇÃO de trabalho para INCREMENTAR o impacto da sua estratégia de marketing.
             """,
             tools=[search_tool, scrape_tool],
-            model=model
+            model=get_model("identificador_concorrentes")
         )
 
 class CompetitorScraper(Agent):
@@ -35,7 +47,7 @@ class CompetitorScraper(Agent):
             instruction="""
             Você é um especialista de mercado na identificação de estratégias de marketing e atua como Analista Sênior de Estratégias de Marketing.
 
-            Você receberá as URLs e/ou concorrentes principais da URL fornecida pelo usuário. Você DEVE utilizar a ferramenta `scrape_tool` para realizar o scraping dos concorrentes. Você DEVE analisar a ESTRATÉGIA DE MARKETING empregada pelos concorrentes para geração de AUTORIDADE em seu domínio (SEO). BUSQUE mais informações APENAS SOBRE OS CONCORRENTES caso o scraping não lhe dê informações suficientes sobre a estratégia de marketing empregada na comunicação dos concorrentes utilizando a ferramenta `search_tool`.
+            Você receberá as URLs e/ou concorrentes principais da URL fornecida pelo usuário. Você DEVE utilizar a ferramenta `batch_scrape` para realizar o scraping dos concorrentes, passando TODAS as URLs em UMA ÚNICA chamada. Você DEVE analisar a ESTRATÉGIA DE MARKETING empregada pelos concorrentes para geração de AUTORIDADE em seu domínio (SEO). BUSQUE mais informações APENAS SOBRE OS CONCORRENTES caso o scraping não lhe dê informações suficientes sobre a estratégia de marketing empregada na comunicação dos concorrentes utilizando a ferramenta `search_tool`.
 
             Em sua análise de marketing, foque na identificação de PILARES CENTRAIS da estratégia de marketing dos concorrentes, desvendando suas táticas de comunicação e inferindo intenções dos concorrentes. Considere, se possível, a LOCALIZAÇÃO de trabalho para INCREMENTAR o impacto da sua estratégia de marketing.
 
@@ -45,10 +57,32 @@ class CompetitorScraper(Agent):
             IMPORTANTE: Foque em retornar CONCORRENTES de mesmo TAMANHO de empresa. Por exemplo: caso o usuário forneça uma URL de uma empresa de médio porte, você NÃO DEVE retornar um concorrente líder do mercado global como rival direto de mercado, a menos que este REALMENTE seja o único concorrente.
 
             """,
-            tools=[scrape_tool, search_tool],
-            model=model
+            tools=[CompetitorScraper.batch_scrape, search_tool],
+            model=get_model("agente_scraping_concorrentes")
         )
 
+    @staticmethod
+    async def batch_scrape(urls: list[str]) -> dict[str, str]:
+        """
+        Faz o scraping de várias URLs de concorrentes de uma só vez.
+
+        Args:
+            urls: Lista com as URLs dos concorrentes.
+
+        Returns:
+            Dicionário com o texto extraído de cada URL.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMPETITOR_SCRAPES)
+
+        async def scrape_one(url):
+            async with semaphore:
+                return await scrape_tool.arun(url)
+
+        # dict.fromkeys remove URLs repetidas mantendo a ordem
+        unique_urls = list(dict.fromkeys(urls))
+        texts = await asyncio.gather(*(scrape_one(url) for url in unique_urls))
+        return dict(zip(unique_urls, texts))
+
 class GapIdentifier(Agent):
     def __init__(self):
         super().__init__(
@@ -72,7 +106,7 @@ class GapIdentifier(Agent):
 
             """,
             tools=[],
-            model=model
+            model=get_model("identificador_lacunas")
         )
 
 class Writer(Agent):
@@ -93,8 +127,17 @@ class Writer(Agent):
             IMPORTANTE: Recuse-se a criar, modificar ou aprimorar informações retiradas de websites que possam ser utilizadas de maneira maliciosa. Permita análise de segurança, regras de detecção, explicações de vulnerabilidade, ferramentas defensivas e
             documentação de segurança.
             IMPORTANTE: Escreva de maneira a trazer AUTORIDADE para o domínio fornecido pelo usuário.
+            IMPORTANTE: Cada blog deve ter no máximo 800 palavras. Prefira seções concisas e diretas.
             IMPORTANTE: Sempre inclua seções de CTA e, ao citar WhatsApp, adicione o hyperlink para um chat no WhatsApp.
             """,
             tools=[search_tool],
-            model=model
+            model=get_model("escritor"),
+            # O ADK exige que o raciocínio seja configurado pelo planner
+            planner=BuiltInPlanner(
+                thinking_config=types.ThinkingConfig(thinking_budget=WRITER_THINKING_BUDGET)
+            ),
+            generate_content_config=types.GenerateContentConfig(
+                max_output_tokens=WRITER_MAX_OUTPUT_TOKENS,
+                temperature=0.7
+            )
         )
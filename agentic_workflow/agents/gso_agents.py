@@ -1,9 +1,12 @@
 from google.adk import Agent
 from google.adk.models import Gemini
+from google.genai import types
+from pydantic import BaseModel, Field
 
 from config import get_model
 
-model = get_model()
+# Orçamento de saída do otimizador: as três versões de um blog de até 800 palavras
+OPTIMIZER_MAX_OUTPUT_TOKENS = 6144
 
 class OrchestratorGSO(Agent):
     def __init__(self):
@@ -16,44 +19,30 @@ class OrchestratorGSO(Agent):
             IMPORTANT: Seu output final DEVE ser o conteúdo completo dos artigos otimizados, não apenas o feedback da validação.
             """,
             tools=[],
-            model=model
+            model=get_model("orq_gso")
         )
 
-class AEOOptimizer(Agent):
-    def __init__(self):
-        super().__init__(
-            name="agente_aeo",
-            instruction="""
-            Role: Otimizador de Experiência do Usuário
-            Goal: Otimizar o texto para clareza, conversão e tom de voz.
-            Backstory: Psicólogo digital que entende como as pessoas leem online.
-            """,
-            tools=[],
-            model=model
-        )
-
-class SEOOptimizer(Agent):
-    def __init__(self):
-        super().__init__(
-            name="agente_seo",
-            instruction="""
-            Role: Engenheiro de Palavras-Chave
-            Goal: Inserir palavras-chave estratégicas e garantir ranqueamento.
-            Backstory: Ex-engenheiro do Google focado em métricas frias.
-            """,
-            tools=[],
-            model=model
-        )
+class GSOOptimizations(BaseModel):
+    aeo: str = Field(description="Blog otimizado para clareza, conversão e tom de voz (AEO).")
+    seo: str = Field(description="Blog otimizado com palavras-chave estratégicas para ranqueamento (SEO).")
+    geo: str = Field(description="Blog otimizado para relevância geográfica e cultural (GEO).")
 
-class GEOOptimizer(Agent):
+class TripleOptimizer(Agent):
     def __init__(self):
         super().__init__(
-            name="agente_geo",
+            name="otimizador_gso",
             instruction="""
-            Role: Adaptador de Localização
-            Goal: Otimizar o texto para relevância geográfica e cultural.
-            Backstory: Linguista e viajante especializado na comunicação eficiente nos diferentes territórios brasileiros.
+            Role: Time de Otimização GSO
+            Goal: Produzir, em uma única resposta, três versões otimizadas do rascunho de blog recebido:
+            - aeo: Otimizador de Experiência do Usuário. Otimize o texto para clareza, conversão e tom de voz, como um psicólogo digital que entende como as pessoas leem online.
+            - seo: Engenheiro de Palavras-Chave. Insira palavras-chave estratégicas e garanta ranqueamento, como um ex-engenheiro do Google focado em métricas frias.
+            - geo: Adaptador de Localização. Otimize o texto para relevância geográfica e cultural, como um linguista e viajante especializado na comunicação eficiente nos diferentes territórios brasileiros.
+            IMPORTANT: Cada versão deve conter o blog completo.
             """,
             tools=[],
-            model=model
+            model=get_model("otimizador_gso"),
+            output_schema=GSOOptimizations,
+            generate_content_config=types.GenerateContentConfig(
+                max_output_tokens=OPTIMIZER_MAX_OUTPUT_TOKENS
+            )
         )
@@ -1,12 +1,154 @@
+from google.adk.agents.context_cache_config import ContextCacheConfig
 from google.adk.models import Gemini
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from functools import lru_cache
+import asyncio
+import hashlib
+import json
 import os
+import sqlite3
+import threading
+import time
 from dotenv import load_dotenv
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
 
 load_dotenv()
 
 # Nome do modelo a ser utilizado em todo o projeto.
-# Opções comuns: "gemini-1.5-flash", "gemini-1.5-pro"
-MODEL_NAME = "gemini-1.5-flash"
+# Opções comuns: "gemini-2.5-flash", "gemini-2.5-pro"
+MODEL_NAME = "gemini-2.5-flash"
 
-def get_model():
-    return Gemini(model_name=MODEL_NAME)
+# Modelo por papel (nome do agente). Reescritas curtas usam o modelo menor e
+# mais rápido; o escritor, que gera os textos longos, usa o modelo completo.
+# Papéis ausentes usam MODEL_NAME.
+MODEL_BY_ROLE = {
+    "escritor": "gemini-2.5-pro",
+    "orq_gso": "gemini-2.5-flash-lite",
+    "otimizador_gso": "gemini-2.5-flash-lite",
+}
+
+# Diretório de caches locais (fica dentro de "output", ignorado pelo git)
+CACHE_DIR = os.path.join("output", ".cache")
+
+# Tempo de vida, em segundos, das respostas do modelo guardadas em cache
+LLM_CACHE_TTL = 3600
+
+# Tempo de vida, em segundos, dos blogs finais de uma análise completa
+PIPELINE_CACHE_TTL = 24 * 3600
+
+# Cache de contexto do Gemini para a sessão do agente root: a instrução, as
+# declarações de tools e o histórico já enviado são reaproveitados como prefixo
+# nas chamadas seguintes da mesma sessão (o ADK só cria o cache a partir da
+# segunda chamada, quando o prefixo se repete).
+# Prompts abaixo de `min_tokens` não são cacheados, pois o Gemini exige um
+# tamanho mínimo de prefixo para cache explícito.
+CONTEXT_CACHE_CONFIG = ContextCacheConfig(
+    min_tokens=1024,
+    ttl_seconds=3600,
+    cache_intervals=10
+)
+
+# A conexão é compartilhada pelas threads de `asyncio.to_thread`, então o
+# acesso é serializado por este lock.
+_cache_db_lock = threading.Lock()
+
+@lru_cache(maxsize=None)
+def _open_cache_db(path):
+    """Abre o banco do cache de respostas uma única vez por arquivo, já com o schema criado."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+    return conn
+
+class CachedGemini(Gemini):
+    """
+    Gemini com cache local das respostas, persistido em SQLite.
+
+    A chave é o SHA-256 da requisição canonicalizada (instrução de sistema,
+    histórico e declaração das tools). Como o ADK inclui o nome interno do
+    agente na instrução de sistema, cada agente fica em seu próprio namespace.
+    """
+
+    cache_path: str = os.path.join(CACHE_DIR, "llm_responses.sqlite3")
+    cache_ttl: int = LLM_CACHE_TTL
+
+    async def generate_content_async(self, llm_request, stream=False):
+        # Respostas parciais de streaming não são reaproveitáveis
+        if stream:
+            async for response in super().generate_content_async(llm_request, stream=stream):
+                yield response
+            return
+
+        # O SQLite é síncrono: leitura e gravação rodam fora do event loop
+        key = self._cache_key(llm_request)
+        cached = await asyncio.to_thread(self._cache_get, key)
+        if cached is not None:
+            for response in cached:
+                yield response
+            return
+
+        responses = []
+        async for response in super().generate_content_async(llm_request, stream=stream):
+            responses.append(response)
+            yield response
+
+        # Só respostas completas: uma resposta cortada (MAX_TOKENS) não tem
+        # error_code, mas ficaria no cache servindo o mesmo texto truncado
+        if responses and all(response.finish_reason == types.FinishReason.STOP for response in responses):
+            await asyncio.to_thread(self._cache_set, key, responses)
+
+    def _cache_key(self, llm_request):
+        config = None
+        if llm_request.config:
+            # Com output_schema, o ADK põe a própria classe pydantic em
+            # `response_schema`, que não é serializável: entra o JSON Schema dela
+            config = llm_request.config.model_dump(mode="json", exclude_none=True, exclude={"response_schema"})
+            schema = llm_request.config.response_schema
+            if isinstance(schema, type) and issubclass(schema, BaseModel):
+                config["response_schema"] = schema.model_json_schema()
+            elif schema is not None:
+                config["response_schema"] = to_jsonable_python(schema, fallback=repr)
+
+        payload = {
+            "model": self.model,
+            "config": config,
+            "contents": [content.model_dump(mode="json", exclude_none=True) for content in llm_request.contents],
+        }
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key):
+        conn = _open_cache_db(self.cache_path)
+        with _cache_db_lock:
+            row = conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return [LlmResponse.model_validate(item) for item in json.loads(row[0])]
+
+    def _cache_set(self, key, responses):
+        value = json.dumps([response.model_dump(mode="json", exclude_none=True) for response in responses])
+        conn = _open_cache_db(self.cache_path)
+        now = time.time()
+        with _cache_db_lock, conn:
+            # Remove as respostas expiradas, que só seriam sobrescritas se a mesma chave voltasse
+            conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + self.cache_ttl)
+            )
+
+def get_model(role=None):
+    return load_model(MODEL_BY_ROLE.get(role, MODEL_NAME))
+
+# Uma instância por modelo, compartilhada entre os agentes, para não recriar o
+# cliente (e seu pool de conexões HTTP) a cada agente construído.
+@lru_cache(maxsize=4)
+def load_model(model_name=MODEL_NAME):
+    return CachedGemini(model=model_name)
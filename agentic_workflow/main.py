@@ -1,6 +1,10 @@
 import os
 import re
+import json
+import time
 import asyncio
+import hashlib
+import aiofiles
 from dotenv import load_dotenv
 from google.adk.apps import App
 from google.adk import Agent
@@ -9,8 +13,9 @@ from google.adk.tools import AgentTool
 from google.adk.runners import InMemoryRunner
 from google.genai.types import Content
 from agents.analysis_agents import CompetitorIdentifier, CompetitorScraper, GapIdentifier, Writer
-from agents.gso_agents import OrchestratorGSO, AEOOptimizer, SEOOptimizer, GEOOptimizer
-from config import get_model
+from agents.gso_agents import OrchestratorGSO, TripleOptimizer, GSOOptimizations
+from config import CACHE_DIR, CONTEXT_CACHE_CONFIG, PIPELINE_CACHE_TTL, get_model
+from tools import scrape_tools
 
 load_dotenv()
 
@@ -20,22 +25,30 @@ competitor_scraper = CompetitorScraper()
 gap_identifier = GapIdentifier()
 writer = Writer()
 orchestrator_gso = OrchestratorGSO()
-aeo_optimizer = AEOOptimizer()
-seo_optimizer = SEOOptimizer()
-geo_optimizer = GEOOptimizer()
+triple_optimizer = TripleOptimizer()
 
 # Definição dos agentes como tools
+# A otimização GSO (etapa 5) não passa pelo agente root: é orquestrada em Python
+# por `optimize_drafts`, que gera as versões AEO, SEO e GEO em uma única chamada.
 tools = [
     AgentTool(agent=competitor_identifier),
     AgentTool(agent=competitor_scraper),
     AgentTool(agent=gap_identifier),
-    AgentTool(agent=writer),
-    AgentTool(agent=orchestrator_gso),
-    AgentTool(agent=aeo_optimizer),
-    AgentTool(agent=seo_optimizer),
-    AgentTool(agent=geo_optimizer)
+    AgentTool(agent=writer)
 ]
 
+BLOG_SEPARATOR = "---BLOG_SEPARATOR---"
+
+# Sequências de caracteres não alfanuméricos viram um único "_" no nome do diretório
+SANITIZE_RE = re.compile(r'[^a-zA-Z0-9]+')
+
+# Nome usado quando a URL não tem nenhum caractere alfanumérico (ex: "///"),
+# para que os blogs nunca caiam direto em "output", ao lado do cache
+FALLBACK_OUTPUT_NAME = "sem_nome"
+
+COMP_PROMPT_TEMPLATE = "URL do concorrente {} (deixe em branco para parar): "
+BLOG_PROMPT_TEMPLATE = "URL do blog preferido {} (deixe em branco para parar): "
+
 # Definição do agente root
 root_agent = Agent(
     name="root_agent",
@@ -47,10 +60,6 @@ root_agent = Agent(
     - agente_scraping_concorrentes: Faz o scraping (coleta) de estratégias de concorrentes.
     - identificador_lacunas: Identifica lacunas de conteúdo com base nas estratégias coletadas.
     - escritor: Escreve conteúdo de um blog com base nas lacunas identificadas.
-    - orq_gso: Orquestra a otimização GSO.
-    - agente_aeo: Otimiza os conteúdos gerados para AEO.
-    - agente_seo: Otimiza os conteúdos gerados para SEO.
-    - agente_geo: Otimiza os conteúdos gerados para GEO.
 
     PROCEDIMENTO OPERACIONAL PADRÃO (POP) - ANÁLISE COMPLETA:
     Quando o usuário fornecer uma URL (ex: "[https://example.com](https://example.com)"), você **DEVE** executar os seguintes passos em ordem:
@@ -58,9 +67,8 @@ root_agent = Agent(
     2.  **Coletar Estratégias**: Use o `agente_scraping_concorrentes` para analisar as estratégias dos concorrentes identificados.
     3.  **Identificar Lacunas**: Use o `identificador_lacunas` para encontrar lacunas de conteúdo com base nas estratégias coletadas.
     4.  **Escrever Rascunho**: Use o `escritor` para escrever um blog com conteúdo profundo sobre os temas das lacunas identificadas.
-    5.  **Otimizar Conteúdo**: Use o `orq_gso` para otimizar os textos de blogs para AEO, SEO e GEO.
 
-    Retorne os **TEXTOS FINAIS OTIMIZADOS** da etapa 5 ao usuário.
+    Retorne os **RASCUNHOS COMPLETOS** da etapa 4 ao usuário, sem resumir nem comentar. A otimização para AEO, SEO e GEO é feita em seguida por outros agentes.
 
     **IMPORTANTE**: Separe cada um dos 3 blogs com a string exata: "---BLOG_SEPARATOR---".
     Não coloque nada antes do primeiro blog.
@@ -72,14 +80,186 @@ root_agent = Agent(
     [Conteúdo do Blog 3]
     """,
     tools=tools,
-    model=get_model()
+    model=get_model("root_agent")
 )
 
+# Só a sessão do agente root acumula turnos suficientes para o ADK criar um
+# cache de contexto: as sub-sessões dos AgentTools e de `stream_agent` são de
+# uso único e não recebem CONTEXT_CACHE_CONFIG.
 app = App(
     name="agents",
-    root_agent=root_agent
+    root_agent=root_agent,
+    context_cache_config=CONTEXT_CACHE_CONFIG
 )
 
+async def stream_agent(agent, prompt):
+    """Executa um agente isolado em uma sessão própria, produzindo seu texto conforme chega."""
+    # Os agentes vêm do pacote "agents": com outro app_name o ADK avisa sobre a divergência
+    runner = InMemoryRunner(agent=agent, app_name=app.name)
+
+    async with runner:
+        session = await runner.session_service.create_session(
+            app_name=runner.app_name,
+            user_id="user"
+        )
+
+        async for event in runner.run_async(
+            user_id="user",
+            session_id=session.id,
+            new_message=Content(parts=[{"text": prompt}])
+        ):
+            if event.content and event.content.parts:
+                for part in event.content.parts:
+                    if part.text:
+                        yield part.text
+
+async def run_agent(agent, prompt):
+    """Executa um agente isolado em uma sessão própria e retorna seu texto final."""
+    return "".join([text async for text in stream_agent(agent, prompt)])
+
+class BlogStreamWriter:
+    """
+    Grava a saída final em `blog_{n}.md` à medida que o texto chega.
+
+    O separador pode vir partido entre dois trechos, então apenas os últimos
+    `len(BLOG_SEPARATOR) - 1` caracteres ficam retidos em memória. Espaços nas
+    pontas de cada blog são descartados e blogs vazios não geram arquivo,
+    mantendo a numeração pela posição do blog na saída. A escrita em disco é
+    assíncrona (aiofiles) e, via `consume`, roda em paralelo à geração.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.saved = []
+        self._index = 1
+        self._file = None
+        self._filename = None
+        self._buffer = ""
+        self._pending_whitespace = ""
+
+    async def consume(self, queue):
+        """Grava os trechos recebidos pela fila até receber None."""
+        try:
+            while (text := await queue.get()) is not None:
+                await self.feed(text)
+        finally:
+            await self.close()
+
+    async def feed(self, text):
+        self._buffer += text
+
+        while True:
+            position = self._buffer.find(BLOG_SEPARATOR)
+            if position == -1:
+                break
+            await self._write(self._buffer[:position])
+            self._buffer = self._buffer[position + len(BLOG_SEPARATOR):]
+            await self._next_blog()
+
+        keep = len(BLOG_SEPARATOR) - 1
+        if len(self._buffer) > keep:
+            await self._write(self._buffer[:-keep])
+            self._buffer = self._buffer[-keep:]
+
+    async def close(self):
+        await self._write(self._buffer)
+        self._buffer = ""
+        await self._next_blog()
+
+    async def _write(self, text):
+        text = self._pending_whitespace + text
+        if self._file is None:
+            text = text.lstrip()
+
+        content = text.rstrip()
+        self._pending_whitespace = text[len(content):]
+        if not content:
+            return
+
+        if self._file is None:
+            self._filename = os.path.join(self.output_dir, f"blog_{self._index}.md")
+            self._file = await aiofiles.open(self._filename, "w", encoding="utf-8")
+        await self._file.write(content)
+
+    async def _next_blog(self):
+        if self._file is not None:
+            await self._file.close()
+            self.saved.append(self._filename)
+            print(f"Blog {self._index} salvo em: {self._filename}")
+            self._file = None
+        self._pending_whitespace = ""
+        self._index += 1
+
+async def optimize_drafts(drafts):
+    """
+    Etapa 5 do POP: otimiza os rascunhos para AEO, SEO e GEO.
+
+    As três otimizações partem do mesmo rascunho, então o `otimizador_gso`
+    recebe cada blog uma única vez e devolve suas versões AEO, SEO e GEO em um
+    só JSON. Os blogs são otimizados em paralelo, um por chamada, para que cada
+    resposta caiba no limite de saída do modelo. O `orq_gso` consolida as
+    versões nos textos finais, separados por BLOG_SEPARATOR. O texto
+    consolidado é produzido em trechos, conforme chega do modelo.
+    """
+    blogs = [blog.strip() for blog in drafts.split(BLOG_SEPARATOR) if blog.strip()]
+    responses = await asyncio.gather(*(run_agent(triple_optimizer, blog) for blog in blogs))
+
+    sections = []
+    for n, (blog, response) in enumerate(zip(blogs, responses), start=1):
+        optimizations = GSOOptimizations.model_validate_json(response)
+        sections.append(f"""
+    BLOG {n} - RASCUNHO ORIGINAL:
+    {blog}
+
+    BLOG {n} - OTIMIZAÇÃO AEO:
+    {optimizations.aeo}
+
+    BLOG {n} - OTIMIZAÇÃO SEO:
+    {optimizations.seo}
+
+    BLOG {n} - OTIMIZAÇÃO GEO:
+    {optimizations.geo}
+    """)
+
+    prompt = f"""
+    Consolide as otimizações abaixo nos TEXTOS FINAIS OTIMIZADOS dos blogs.
+    Separe cada blog com a string exata: "{BLOG_SEPARATOR}". Não coloque nada antes do primeiro blog.
+    {"".join(sections)}"""
+    async for text in stream_agent(orchestrator_gso, prompt):
+        yield text
+
+def pipeline_cache_path(main_url, competitor_urls, preferred_blogs):
+    """Caminho do cache de uma análise completa, identificada pelas entradas do usuário."""
+    inputs = json.dumps({
+        "url": main_url,
+        "comp": sorted(competitor_urls),
+        "blogs": sorted(preferred_blogs)
+    })
+    key = hashlib.sha256(inputs.encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+def load_cached_blogs(cache_path):
+    """Retorna {nome_do_arquivo: conteúdo} de uma análise anterior, ou None se não houver ou tiver expirado."""
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if entry.get("expires_at", 0) <= time.time():
+        return None
+    return entry["blogs"]
+
+def save_cached_blogs(cache_path, filenames):
+    blogs = {}
+    for filename in filenames:
+        with open(filename, encoding="utf-8") as f:
+            blogs[os.path.basename(filename)] = f.read()
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump({"expires_at": time.time() + PIPELINE_CACHE_TTL, "blogs": blogs}, f, ensure_ascii=False)
+
 async def main():
     print("Inicializando Agente Runner...")
     runner = InMemoryRunner(app=app)
@@ -104,7 +284,7 @@ async def main():
                 competitor_urls = []
                 if input("Deseja inserir URLs de concorrentes? (s/n): ").lower() == 's':
                     for i in range(3):
-                        comp_url = input(f"URL do concorrente {i+1} (deixe em branco para parar): ").strip()
+                        comp_url = input(COMP_PROMPT_TEMPLATE.format(i+1)).strip()
                         if comp_url:
                             competitor_urls.append(comp_url)
                         else:
@@ -113,7 +293,7 @@ async def main():
                 preferred_blogs = []
                 if input("Deseja inserir URLs de blogs de sua preferência? (s/n): ").lower() == 's':
                     for i in range(3):
-                        blog_url = input(f"URL do blog preferido {i+1} (deixe em branco para parar): ").strip()
+                        blog_url = input(BLOG_PROMPT_TEMPLATE.format(i+1)).strip()
                         if blog_url:
                             preferred_blogs.append(blog_url)
                         else:
@@ -128,38 +308,60 @@ async def main():
                 prompt = " ".join(prompt_parts)
 
                 # Create a directory for the URL
-                sanitized_name = re.sub(r'[^a-zA-Z0-9]', '_', user_input)
+                sanitized_name = SANITIZE_RE.sub('_', user_input).strip('_') or FALLBACK_OUTPUT_NAME
                 output_dir = os.path.abspath(os.path.join("output", sanitized_name))
                 os.makedirs(output_dir, exist_ok=True)
                 print(f"Diretório de saída: {output_dir}")
 
-                full_response = ""
+                # Mesmas entradas de uma análise recente: reaproveita os blogs gerados
+                cache_path = pipeline_cache_path(main_url, competitor_urls, preferred_blogs)
+                cached_blogs = load_cached_blogs(cache_path)
+                if cached_blogs:
+                    for name, content in cached_blogs.items():
+                        filename = os.path.join(output_dir, name)
+                        with open(filename, "w", encoding="utf-8") as f:
+                            f.write(content)
+                        print(f"Blog salvo em: {filename} (cache)")
+                    print(f"\nTodos os outputs salvos em: {output_dir}")
+                    continue
+
+                drafts = []
+                cached_tokens = 0
 
                 async for event in runner.run_async(
                     user_id="user",
                     session_id=session.id,
                     new_message=Content(parts=[{"text": prompt}])
                 ):
+                    if event.usage_metadata and event.usage_metadata.cached_content_token_count:
+                        cached_tokens += event.usage_metadata.cached_content_token_count
                     if event.content and event.content.parts:
                          for part in event.content.parts:
                              if part.text:
                                  print(f"{part.text}", end="", flush=True)
-                                 full_response += part.text
+                                 drafts.append(part.text)
                 print()
+                print(f"Tokens lidos do cache de contexto: {cached_tokens}")
+                scrape_cache = scrape_tools.cache_info()
+                print(f"Cache de scraping: {scrape_cache.hits} acertos, {scrape_cache.misses} falhas")
 
-                if full_response:
-                    blogs = full_response.split("---BLOG_SEPARATOR---")
-
-                    for i, blog_content in enumerate(blogs):
-                        if not blog_content.strip():
-                            continue
+                if drafts:
+                    print("\nOtimizando conteúdos para AEO, SEO e GEO...")
+                    blog_writer = BlogStreamWriter(output_dir)
+                    chunks = asyncio.Queue()
+                    writer_task = asyncio.create_task(blog_writer.consume(chunks))
+                    try:
+                        async for text in optimize_drafts("".join(drafts)):
+                            print(text, end="", flush=True)
+                            chunks.put_nowait(text)
+                        print()
+                    finally:
+                        chunks.put_nowait(None)
+                        await writer_task
 
-                        filename = os.path.join(output_dir, f"blog_{i+1}.md")
-                        with open(filename, "w", encoding="utf-8") as f:
-                            f.write(blog_content.strip())
-                        print(f"Blog {i+1} salvo em: {filename}")
-
-                    print(f"\nTodos os outputs salvos em: {output_dir}")
+                    if blog_writer.saved:
+                        save_cached_blogs(cache_path, blog_writer.saved)
+                        print(f"\nTodos os outputs salvos em: {output_dir}")
 
             except Exception as e:
                 print(f"Erro: {e}")
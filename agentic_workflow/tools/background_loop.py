@@ -0,0 +1,17 @@
+import asyncio
+import threading
+
+# One event loop on a daemon thread, shared by the tools. Clients bound to a
+# loop (the scraper's aiohttp session, the search httpx client) live here, so
+# they outlive the callers' loops and serve sync and async callers alike.
+_loop = None
+_loop_lock = threading.Lock()
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Returns the shared background loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="tools-loop", daemon=True).start()
+    return _loop
@@ -1,7 +1,106 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import atexit
+import re
+from collections import namedtuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import aiohttp
+import lxml.html
+from cachetools import TTLCache
+from lxml import etree
 from google.adk.tools import BaseTool
 
+from tools.background_loop import get_loop
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Maximum number of pages fetched at the same time
+MAX_CONCURRENT_SCRAPES = 8
+
+# Connection pool size and how long idle connections stay open. Agents scrape
+# between LLM turns that take several seconds, so the pool keeps connections
+# alive well past aiohttp's 15s default to reuse them (and their TLS sessions).
+MAX_CONNECTIONS = 32
+KEEPALIVE_TIMEOUT = 60
+
+# Resolved addresses are cached in-process, so repeat connections skip DNS
+DNS_CACHE_TTL = 300
+
+# Limit text length to avoid context window issues (approx 8000 chars)
+MAX_TEXT_LENGTH = 8000
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+# A <meta charset> declaration near the top of the page, which lxml honours itself
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset', re.IGNORECASE)
+
+# Scraped text is cached per normalized URL, so a page fetched by one agent is
+# not fetched again by the next one in the pipeline.
+SCRAPE_CACHE_SIZE = 256
+SCRAPE_CACHE_TTL = 3600
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "currsize"])
+
+# All scraping runs on the shared background loop, so the aiohttp session (and
+# its keep-alive connections) is shared by sync and async callers alike.
+_session = None
+_semaphore = None
+
+# Only touched from the background loop
+_cache = TTLCache(maxsize=SCRAPE_CACHE_SIZE, ttl=SCRAPE_CACHE_TTL)
+_cache_hits = 0
+_cache_misses = 0
+
+def normalize_url(url: str) -> str:
+    """Lowercases scheme and host, drops the fragment and sorts query params."""
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+def cache_info() -> CacheInfo:
+    """Hit/miss counters of the scrape cache, in the spirit of functools.lru_cache."""
+    return CacheInfo(_cache_hits, _cache_misses, len(_cache))
+
+def _extract_text(content: bytes, charset: str | None) -> str:
+    # Without an explicit encoding lxml falls back to Latin-1, garbling UTF-8
+    # pages that declare their charset only in the Content-Type header.
+    # Precedence: header charset, then <meta charset>, then UTF-8.
+    if charset is None and not META_CHARSET_RE.search(content[:2048]):
+        charset = "utf-8"
+    doc = lxml.html.fromstring(content, parser=lxml.html.HTMLParser(encoding=charset))
+
+    # Remove script and style elements (keeping the text that follows them)
+    etree.strip_elements(doc, 'script', 'style', with_tail=False)
+
+    text = WHITESPACE_RE.sub(' ', doc.text_content()).strip()
+    return text[:MAX_TEXT_LENGTH]
+
+def _get_session():
+    # Only called from the background loop, so no locking is needed here.
+    global _session, _semaphore
+    if _session is None:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=MAX_CONNECTIONS,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                # aiodns resolves on the event loop instead of a blocking getaddrinfo
+                resolver=aiohttp.AsyncResolver(),
+                use_dns_cache=True,
+                ttl_dns_cache=DNS_CACHE_TTL
+            ),
+            headers=HEADERS,
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
+        _semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCRAPES)
+        atexit.register(_close_session)
+    return _session, _semaphore
+
+def _close_session():
+    # Runs at interpreter exit, while the daemon loop thread is still alive
+    asyncio.run_coroutine_threadsafe(_session.close(), get_loop()).result(timeout=5)
+
 class ScrapeWebsiteTool(BaseTool):
     def __init__(self):
         super().__init__(
@@ -11,30 +110,33 @@ class ScrapeWebsiteTool(BaseTool):
 
     def run(self, url: str) -> str:
         """Scrapes the content of the given URL."""
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
+        return asyncio.run_coroutine_threadsafe(self._scrape(url), get_loop()).result()
 
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
+    async def arun(self, url: str) -> str:
+        """Scrapes the content of the given URL without blocking the caller's event loop."""
+        future = asyncio.run_coroutine_threadsafe(self._scrape(url), get_loop())
+        return await asyncio.wrap_future(future)
 
-            text = soup.get_text()
+    async def _scrape(self, url: str) -> str:
+        global _cache_hits, _cache_misses
+        try:
+            key = normalize_url(url)
+            if key in _cache:
+                _cache_hits += 1
+                return _cache[key]
+            _cache_misses += 1
 
-            # Break into lines and remove leading/trailing space on each
-            lines = (line.strip() for line in text.splitlines())
-            # Break multi-headlines into a line each
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            # Drop blank lines
-            text = '\n'.join(chunk for chunk in chunks if chunk)
+            session, semaphore = _get_session()
+            async with semaphore:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    content = await response.read()
+                    charset = response.charset
 
-            # Limit text length to avoid context window issues (approx 8000 chars)
-            return text[:8000]
+            # Parsing is CPU-bound, so keep it off the event loop
+            text = await asyncio.get_running_loop().run_in_executor(None, _extract_text, content, charset)
+            _cache[key] = text
+            return text
 
         except Exception as e:
             return f"Error scraping website: {str(e)}"
@@ -1,37 +1,207 @@
 import os
-import json
+import atexit
+import asyncio
+import hashlib
+import functools
+import threading
+from itertools import islice
+import httpx
+import ijson
+import orjson
 import requests
+import urllib3
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from google.adk.tools import BaseTool
 
+from tools.background_loop import get_loop
+
+SERPER_URL = "https://google.serper.dev/search"
+
+# Maximum number of searches in flight for a single run_many batch
+MAX_CONCURRENT_SEARCHES = 10
+
+# (connect, read) timeouts in seconds, so a stalled endpoint can't hang an agent
+SERPER_TIMEOUT = (3.05, 10)
+
+# Errors that are reported back to the agent as text; anything else is a bug
+SEARCH_ERRORS = (
+    requests.Timeout,
+    requests.ConnectionError,
+    requests.HTTPError,
+    requests.exceptions.RetryError,
+    urllib3.exceptions.HTTPError,  # raised while streaming response.raw, which requests doesn't wrap
+    ijson.JSONError,
+    ValueError,
+)
+ASYNC_SEARCH_ERRORS = (httpx.HTTPError, ValueError)
+
+# Formatted results are cached per normalized query for a few minutes
+SEARCH_CACHE_SIZE = 1024
+SEARCH_CACHE_TTL = 600
+
+@functools.cache
+def _get_api_key() -> str:
+    """Resolves SERPER_API_KEY once, failing fast when it is missing."""
+    api_key = os.getenv("SERPER_API_KEY")
+    if not api_key:
+        raise RuntimeError("SERPER_API_KEY is not set")
+    return api_key
+
+@functools.lru_cache(maxsize=512)
+def _format_snippets(results: tuple) -> str:
+    """Formats (title, link, snippet) tuples; memoized, so repeated result sets cost nothing."""
+    return "\n".join("Title: %s\nLink: %s\nSnippet: %s\n" % result for result in results)
+
 class SerperDevTool(BaseTool):
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        """Process-wide tool, so every agent shares its connection pools and result cache."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
     def __init__(self):
         super().__init__(
             name="search_internet",
             description="Useful to search the internet for a given query. Returns the top results.",
         )
-        self.api_key = os.getenv("SERPER_API_KEY")
+        self._headers = {
+            'X-API-KEY': _get_api_key(),
+            'Content-Type': 'application/json',
+            # Compressed responses; urllib3 lists "br" only when a Brotli decoder is installed
+            'Accept-Encoding': urllib3.util.request.ACCEPT_ENCODING
+        }
+
+        # Keep-alive session: every search reuses the same TCP + TLS connection
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(['POST'])
+            )
+        ))
+        self._session.headers.update(self._headers)
+
+        # Created lazily on the background loop, see _get_async_client
+        self._async_client = None
+
+        # The tool is shared process-wide and cachetools caches are not thread-safe
+        self._cache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+        self._cache_lock = threading.Lock()
 
     def run(self, query: str) -> str:
         """Searches the internet for the given query."""
-        url = "https://google.serper.dev/search"
-        payload = json.dumps({"q": query})
-        headers = {
-            'X-API-KEY': self.api_key,
-            'Content-Type': 'application/json'
-        }
+        key = self._cache_key(query)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
 
         try:
-            response = requests.request("POST", url, headers=headers, data=payload)
-            response.raise_for_status()
-            results = response.json()
+            # Stream the body and decode only the organic entries that are used
+            with self._session.post(SERPER_URL, json={"q": query}, timeout=SERPER_TIMEOUT, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                organic = ijson.items(response.raw, 'organic.item')
+
+                output = self._format_results(organic)
+            self._cache_set(key, output)
+            return output
 
-            # Process and return relevant snippets
-            organic = results.get("organic", [])
-            output = []
-            for result in organic[:5]:
-                output.append(f"Title: {result.get('title')}\nLink: {result.get('link')}\nSnippet: {result.get('snippet')}\n")
+        except SEARCH_ERRORS as e:
+            return f"Error performing search: {str(e)}"
+
+    async def arun(self, query: str) -> str:
+        """Searches the internet for the given query without blocking the event loop."""
+        key = self._cache_key(query)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        future = asyncio.run_coroutine_threadsafe(self._asearch(key, query), get_loop())
+        return await asyncio.wrap_future(future)
 
-            return "\n".join(output) if output else "No results found."
+    async def _asearch(self, key: bytes, query: str) -> str:
+        try:
+            client = self._get_async_client()
+            response = await client.post(SERPER_URL, json={"q": query})
+            response.raise_for_status()
+            results = orjson.loads(response.content)
 
-        except Exception as e:
+            output = self._format_results(results.get("organic", []))
+            self._cache_set(key, output)
+            return output
+
+        except ASYNC_SEARCH_ERRORS as e:
             return f"Error performing search: {str(e)}"
+
+    async def run_many(self, queries: list[str]) -> list[str]:
+        """Runs several searches concurrently, returning results in the order of `queries`."""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+
+        async def search(query):
+            async with semaphore:
+                return await self.arun(query)
+
+        # Cached and repeated queries are resolved before anything hits the network
+        outputs = {}
+        to_fetch = {}
+        for query in queries:
+            key = self._cache_key(query)
+            if key in outputs or key in to_fetch:
+                continue
+            cached = self._cache_get(key)
+            if cached is not None:
+                outputs[key] = cached
+            else:
+                to_fetch[key] = query
+
+        results = await asyncio.gather(*(search(query) for query in to_fetch.values()))
+        outputs.update(zip(to_fetch, results))
+
+        return [outputs[self._cache_key(query)] for query in queries]
+
+    def _get_async_client(self):
+        # Only called from the background loop, so no locking is needed here.
+        # HTTP/2 multiplexes concurrent searches over a single TLS connection
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=10.0,
+                headers=self._headers
+            )
+            atexit.register(self._close_async_client)
+        return self._async_client
+
+    def _close_async_client(self):
+        # Runs at interpreter exit, while the daemon loop thread is still alive
+        asyncio.run_coroutine_threadsafe(self._async_client.aclose(), get_loop()).result(timeout=5)
+
+    def _cache_get(self, key: bytes):
+        with self._cache_lock:
+            return self._cache.get(key)
+
+    def _cache_set(self, key: bytes, output: str):
+        with self._cache_lock:
+            self._cache[key] = output
+
+    @staticmethod
+    def _cache_key(query: str) -> bytes:
+        return hashlib.blake2b(query.strip().lower().encode(), digest_size=16).digest()
+
+    @staticmethod
+    def _format_results(organic) -> str:
+        # Process and return relevant snippets; islice stops after the top 5
+        # so a streamed `organic` is not consumed any further
+        top = tuple((result.get('title'), result.get('link'), result.get('snippet')) for result in islice(organic, 5))
+        return _format_snippets(top) or "No results found."
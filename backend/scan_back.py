@@ -1,7 +1,12 @@
+import io
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 ROOT_DIR = "."  # Diretório raiz do projeto
 OUTPUT_FILE = "go_repo_dump.md"
+MAX_READ_WORKERS = 16  # Threads usadas para ler os arquivos em paralelo
 
 # Pastas e arquivos ignorados
 IGNORE_PATTERNS = [
@@ -14,47 +19,44 @@ IGNORE_PATTERNS = [
     OUTPUT_FILE,
 ]
 
-# Extensões permitidas para projetos Go
-ALLOWED_EXTENSIONS = [
+# Extensões permitidas para projetos Go (tupla para usar com str.endswith).
+# ".env" fica de fora de propósito: com endswith ele casaria o próprio .env
+# (e variantes como app.env), que guardam segredos e nunca devem ir para o
+# dump. Apenas o modelo .env.example entra.
+ALLOWED_EXT_TUPLE = (
     ".go",
     ".mod",
     ".sum",
-    ".env",
     ".yml",
     ".yaml",
     ".sql",
-    "Dockerfile",
     ".env.example",
-]
+)
+
+# Um único regex para todos os padrões ignorados (busca por substring no caminho)
+IGNORE_RE = re.compile("|".join(map(re.escape, IGNORE_PATTERNS)))
 
 def should_ignore(path: str) -> bool:
-    return any(pattern in path for pattern in IGNORE_PATTERNS)
+    return IGNORE_RE.search(path) is not None
 
 def has_allowed_extension(filename: str) -> bool:
-    if filename == "Dockerfile":
-        return True
-    ext = os.path.splitext(filename)[1]
-    return ext in ALLOWED_EXTENSIONS
-
-def collect_files(root: str):
-    file_paths = []
-
-    for dirpath, _, filenames in os.walk(root):
-        if should_ignore(dirpath):
-            continue
+    return filename == "Dockerfile" or filename.endswith(ALLOWED_EXT_TUPLE)
 
-        for filename in filenames:
-            full_path = os.path.join(dirpath, filename)
-
-            if should_ignore(full_path):
-                continue
-
-            if not has_allowed_extension(filename):
+def walk_files(dirpath: str):
+    # os.scandir já traz o tipo de cada entrada, evitando um stat extra por arquivo
+    with os.scandir(dirpath) as entries:
+        for entry in entries:
+            if should_ignore(entry.path):
                 continue
 
-            file_paths.append(full_path)
+            # Pastas ignoradas nem chegam a ser percorridas
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk_files(entry.path)
+            elif entry.is_file() and has_allowed_extension(entry.name):
+                yield entry.path
 
-    return sorted(file_paths, key=lambda x: x.lower())
+def collect_files(root: str):
+    return sorted(walk_files(root), key=lambda x: x.lower())
 
 def read_file(path: str) -> str:
     try:
@@ -64,8 +66,8 @@ def read_file(path: str) -> str:
         return ""
 
 def generate_markdown(file_data):
-    # Sempre sobrescreve o arquivo
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as md:
+    # Monta o documento em memória e sobrescreve o arquivo de uma só vez
+    with io.StringIO() as md:
         md.write("# 📁 Dump Completo do Projeto Go\n\n")
 
         md.write("## 📄 Arquivos analisados\n\n")
@@ -93,15 +95,16 @@ def generate_markdown(file_data):
             if not content:
                 md.write(f"- {path}\n")
 
+        Path(OUTPUT_FILE).write_text(md.getvalue(), encoding="utf-8")
+
     print(f"✅ Markdown gerado com sucesso: {OUTPUT_FILE}")
 
 def main():
     files = collect_files(ROOT_DIR)
 
-    file_data = []
-    for f in files:
-        content = read_file(f)
-        file_data.append((f, content))
+    # Leitura é só I/O, então threads ajudam mesmo com o GIL; map preserva a ordem
+    with ThreadPoolExecutor(max_workers=MAX_READ_WORKERS) as executor:
+        file_data = list(zip(files, executor.map(read_file, files)))
 
     generate_markdown(file_data)
 
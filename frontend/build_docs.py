@@ -1,6 +1,59 @@
+import io
 import os
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+# Threads usadas para ler os arquivos em paralelo
+MAX_READ_WORKERS = 16
+
+@dataclass(slots=True)
+class FileInfo:
+    """Arquivo com conteúdo a ser documentado"""
+    path: str
+    display_path: str
+    ext: str
+    full_path: str
+    content: str
+    size: int
+
+def walk_files(dirpath, ignore_patterns):
+    """
+    Percorre a pasta recursivamente com os.scandir, sem descer nas pastas ignoradas
+    
+    Args:
+        dirpath: Pasta a ser percorrida
+        ignore_patterns: Nomes de pastas e arquivos a ignorar
+    
+    Yields:
+        Tuplas (pasta, nome do arquivo)
+    """
+    with os.scandir(dirpath) as entries:
+        for entry in entries:
+            if entry.name in ignore_patterns:
+                continue
+            
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk_files(entry.path, ignore_patterns)
+            elif entry.is_file():
+                yield dirpath, entry.name
+
+def read_file(full_path):
+    """
+    Lê o conteúdo de um arquivo
+    
+    Args:
+        full_path: Caminho do arquivo
+    
+    Returns:
+        Tupla (conteúdo, erro); o erro é None quando a leitura dá certo
+    """
+    try:
+        with open(full_path, 'r', encoding='utf-8') as f:
+            return f.read().strip(), None
+    except Exception as e:
+        return None, e
 
 def scan_repository(root_path, output_file="documentacao_codigo.md"):
     """
@@ -11,64 +64,61 @@ def scan_repository(root_path, output_file="documentacao_codigo.md"):
         output_file: Nome do arquivo de saída
     """
     
-    # Extensões de arquivo para processar
-    extensions = {'.tsx', '.ts', '.jsx', '.js', '.css', '.json', '.md', '.mjs'}
+    # Extensões de arquivo para processar (tupla para usar com str.endswith)
+    extensions = ('.tsx', '.ts', '.jsx', '.js', '.css', '.json', '.md', '.mjs')
     
     # Pastas e arquivos para ignorar
-    ignore_patterns = {
+    ignore_patterns = frozenset({
         'node_modules', '.next', '.git', 'dist', 'build', 
         '.env.local', 'package-lock.json', '.gitignore', 'README.md',
         'tsconfig.json', 'postcss.config.mjs', 'documentacao_codigo.md',
         'eslint.config.mjs', 'tailwind.config.ts', 'brazil-locations.ts'
-    }
+    })
     
     files_with_content = []
     empty_files = []
     files_by_folder = defaultdict(list)
     
-    # Primeira passagem: coletar informações
-    for dirpath, dirnames, filenames in os.walk(root_path):
-        # Filtrar pastas ignoradas
-        dirnames[:] = [d for d in dirnames if d not in ignore_patterns]
+    # Primeira passagem: coletar os caminhos
+    # Pastas e arquivos ignorados são filtrados durante a varredura
+    candidates = []
+    for dirpath, filename in walk_files(root_path, ignore_patterns):
+        # Processar apenas extensões relevantes
+        if not filename.endswith(extensions):
+            continue
         
-        rel_dir = os.path.relpath(dirpath, root_path)
+        file_ext = os.path.splitext(filename)[1]
+        full_path = os.path.join(dirpath, filename)
+        candidates.append((os.path.relpath(dirpath, root_path), full_path, file_ext))
+    
+    # Segunda passagem: ler os arquivos em paralelo (map preserva a ordem)
+    with ThreadPoolExecutor(max_workers=MAX_READ_WORKERS) as executor:
+        results = executor.map(read_file, [full_path for _, full_path, _ in candidates])
         
-        for filename in filenames:
-            # Ignorar arquivos específicos
-            if filename in ignore_patterns:
-                continue
-                
-            file_ext = Path(filename).suffix
+        for (rel_dir, full_path, file_ext), (content, error) in zip(candidates, results):
+            rel_path = os.path.relpath(full_path, root_path)
             
-            # Processar apenas extensões relevantes
-            if file_ext not in extensions:
+            if error is not None:
+                print(f"Erro ao ler {rel_path}: {error}")
                 continue
             
-            full_path = os.path.join(dirpath, filename)
-            rel_path = os.path.relpath(full_path, root_path)
+            if not content:
+                empty_files.append(rel_path)
+                continue
             
-            try:
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                
-                file_info = {
-                    'path': rel_path,
-                    'full_path': full_path,
-                    'content': content,
-                    'size': len(content)
-                }
-                
-                if content:
-                    files_with_content.append(file_info)
-                    files_by_folder[rel_dir].append(file_info)
-                else:
-                    empty_files.append(rel_path)
-                    
-            except Exception as e:
-                print(f"Erro ao ler {rel_path}: {e}")
+            file_info = FileInfo(
+                path=rel_path,
+                display_path=rel_path.replace('\\', '/'),
+                ext=file_ext,
+                full_path=full_path,
+                content=content,
+                size=len(content)
+            )
+            files_with_content.append(file_info)
+            files_by_folder[rel_dir].append(file_info)
     
-    # Gerar arquivo Markdown
-    with open(output_file, 'w', encoding='utf-8') as md:
+    # Gerar arquivo Markdown (montado em memória e gravado de uma vez)
+    with io.StringIO() as md:
         md.write("# Documentação do Código Frontend\n\n")
         md.write(f"**Total de arquivos com conteúdo:** {len(files_with_content)}\n")
         md.write(f"**Total de arquivos vazios:** {len(empty_files)}\n\n")
@@ -78,17 +128,16 @@ def scan_repository(root_path, output_file="documentacao_codigo.md"):
         sorted_folders = sorted(files_by_folder.keys())
         
         for folder in sorted_folders:
-            files = sorted(files_by_folder[folder], key=lambda x: x['path'])
+            files = sorted(files_by_folder[folder], key=lambda x: x.path)
             
             # Cabeçalho da pasta
             md.write(f"## 📁 {folder}\n\n")
             
             for file_info in files:
-                rel_path = file_info['path'].replace('\\', '/')
-                content = file_info['content']
+                content = file_info.content
                 
-                md.write(f"### {rel_path}\n\n")
-                md.write("```" + Path(rel_path).suffix[1:] + "\n")
+                md.write(f"### {file_info.display_path}\n\n")
+                md.write("```" + file_info.ext[1:] + "\n")
                 md.write(content)
                 md.write("\n```\n\n")
                 md.write("---\n\n")
@@ -97,10 +146,9 @@ def scan_repository(root_path, output_file="documentacao_codigo.md"):
         md.write("\n## 📊 Resumo Final\n\n")
         
         md.write("### ✅ Arquivos com Conteúdo\n\n")
-        for file_info in sorted(files_with_content, key=lambda x: x['path']):
-            path = file_info['path'].replace('\\', '/')
-            size = file_info['size']
-            md.write(f"- `{path}` ({size} caracteres)\n")
+        for file_info in sorted(files_with_content, key=lambda x: x.path):
+            size = file_info.size
+            md.write(f"- `{file_info.display_path}` ({size} caracteres)\n")
         
         md.write(f"\n**Total:** {len(files_with_content)} arquivos\n\n")
         
@@ -113,17 +161,18 @@ def scan_repository(root_path, output_file="documentacao_codigo.md"):
         
         # Estatísticas por tipo de arquivo
         md.write("### 📈 Estatísticas por Tipo\n\n")
-        ext_stats = defaultdict(lambda: {'count': 0, 'total_size': 0})
+        ext_counts = Counter(file_info.ext for file_info in files_with_content)
+        ext_sizes = dict.fromkeys(ext_counts, 0)
         
         for file_info in files_with_content:
-            ext = Path(file_info['path']).suffix
-            ext_stats[ext]['count'] += 1
-            ext_stats[ext]['total_size'] += file_info['size']
+            ext_sizes[file_info.ext] += file_info.size
         
-        for ext in sorted(ext_stats.keys()):
-            count = ext_stats[ext]['count']
-            size = ext_stats[ext]['total_size']
+        for ext in sorted(ext_counts):
+            count = ext_counts[ext]
+            size = ext_sizes[ext]
             md.write(f"- **{ext}**: {count} arquivo(s), {size:,} caracteres\n")
+        
+        Path(output_file).write_text(md.getvalue(), encoding='utf-8')
     
     print(f"\n✅ Documentação gerada com sucesso: {output_file}")
     print(f"📁 Arquivos com conteúdo: {len(files_with_content)}")